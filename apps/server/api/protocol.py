@@ -0,0 +1,163 @@
+import asyncio
+import json
+import logging
+import zlib
+
+from fastapi import WebSocket
+
+try:
+    import msgpack
+except Exception:  # pragma: no cover - optional dependency at runtime
+    msgpack = None
+
+logger = logging.getLogger("Protocol")
+
+# Compact protocol (negotiated via the "config" message, JSON stays the default):
+#   {"type": "config", "protocol": "msgpack", "compress": true, "coalesce": true}
+# The server answers with a JSON "config_ack" carrying the settings actually
+# applied. Each binary frame is one flag byte followed by a MessagePack
+# payload. The payload is either a single event map or, when coalescing, an
+# array of event maps produced in the same event loop tick. Keys and event
+# types are shortened using the tables below, and word timestamps become
+# positional [word, start, end, probability] arrays. See README for the full
+# contract.
+FLAG_DEFLATE = 0x01
+FLAG_BATCH = 0x02
+
+SHORT_KEYS = {
+    "type": "t",
+    "segment_id": "i",
+    "text": "x",
+    "source_text": "s",
+    "start": "b",
+    "end": "e",
+    "duration_ms": "d",
+    "words": "w",
+}
+
+SHORT_TYPES = {
+    "vad_start": 0,
+    "vad_commit": 1,
+    "transcript": 2,
+    "transcript_corrected": 3,
+    "translation": 4,
+}
+
+# Payloads smaller than this are not worth deflating.
+DEFLATE_MIN_BYTES = 64
+
+
+def read_flag(payload: dict, key: str, default: bool) -> bool:
+    """Read a boolean config field, ignoring anything that is not a real bool."""
+    value = payload.get(key, default)
+    if not isinstance(value, bool):
+        logger.warning(f"Ignoring non-boolean {key}: {value!r}")
+        return default
+    return value
+
+
+class EventSender:
+    """
+    Serializes outgoing events for one websocket connection.
+    Uses plain send_json by default; after negotiation it can switch to
+    MessagePack with short keys, raw deflate, and per-tick coalescing.
+    """
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.protocol = "json"
+        self.compress = False
+        self.coalesce = False
+        self.closed = False
+        self._pending: list[dict] = []
+        self._flush_task: asyncio.Task | None = None
+
+    async def configure(self, payload: dict) -> None:
+        """Apply protocol settings from a config message and acknowledge them in JSON."""
+        protocol = payload.get("protocol", self.protocol)
+        if protocol == "msgpack" and msgpack is None:
+            logger.warning("msgpack package not available. Falling back to JSON protocol.")
+            protocol = "json"
+        elif protocol not in {"json", "msgpack"}:
+            logger.warning(f"Unknown protocol requested: {protocol}")
+            protocol = self.protocol
+
+        compress = read_flag(payload, "compress", self.compress)
+        coalesce = read_flag(payload, "coalesce", self.coalesce)
+
+        # Ack in the old framing (always JSON text) before switching
+        await self.websocket.send_json({
+            "type": "config_ack",
+            "protocol": protocol,
+            "compress": compress and protocol == "msgpack",
+            "coalesce": coalesce,
+        })
+
+        self.protocol = protocol
+        self.compress = compress
+        self.coalesce = coalesce
+        logger.info(
+            f"Protocol set to: {self.protocol} "
+            f"(compress={self.compress}, coalesce={self.coalesce})"
+        )
+
+    async def send(self, event: dict) -> None:
+        if self.closed:
+            return
+
+        if not self.coalesce:
+            await self._send_frame([event])
+            return
+
+        self._pending.append(event)
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_next_tick())
+
+    async def _flush_next_tick(self) -> None:
+        # Yield once so other tasks scheduled in this tick can add their events.
+        await asyncio.sleep(0)
+        events, self._pending = self._pending, []
+        self._flush_task = None
+        try:
+            await self._send_frame(events)
+        except Exception as e:
+            logger.error(f"Failed to send coalesced events: {e}")
+
+    async def _send_frame(self, events: list[dict]) -> None:
+        if not events:
+            return
+
+        if self.protocol == "json":
+            if len(events) == 1:
+                await self.websocket.send_json(events[0])
+            else:
+                await self.websocket.send_text(json.dumps(events))
+            return
+
+        await self.websocket.send_bytes(self.encode_compact(events))
+
+    def encode_compact(self, events: list[dict]) -> bytes:
+        flags = 0
+        if len(events) == 1:
+            body = self._shorten(events[0])
+        else:
+            body = [self._shorten(event) for event in events]
+            flags |= FLAG_BATCH
+
+        packed = msgpack.packb(body, use_bin_type=True)
+        if self.compress and len(packed) >= DEFLATE_MIN_BYTES:
+            compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+            packed = compressor.compress(packed) + compressor.flush()
+            flags |= FLAG_DEFLATE
+
+        return bytes([flags]) + packed
+
+    def _shorten(self, event: dict) -> dict:
+        compact = {}
+        for key, value in event.items():
+            if key == "type":
+                value = SHORT_TYPES.get(value, value)
+            elif key == "words":
+                # Positional [word, start, end, probability] instead of repeated keys
+                value = [[w["word"], w["start"], w["end"], w["probability"]] for w in value]
+            compact[SHORT_KEYS.get(key, key)] = value
+        return compact
@@ -3,20 +3,55 @@ try:
     from apps.server.core.vad_sequencer import VADSequencer
     from apps.server.core.asr_engine import ASREngine
     from apps.server.core.translator import Translator
+    from apps.server.core.speech_filter import SpeechFilter
+    from apps.server.core.subtitle_writer import SubtitleWriter
+    from apps.server.api.protocol import EventSender, read_flag
 except ImportError:
     from core.vad_sequencer import VADSequencer
     from core.asr_engine import ASREngine
     from core.translator import Translator
+    from core.speech_filter import SpeechFilter
+    from core.subtitle_writer import SubtitleWriter
+    from api.protocol import EventSender, read_flag
 import logging
 import json
 import asyncio
 from collections import deque
 import os
+import time
+import uuid
 from itertools import count
 def trim_history(history_items: list[str], limit: int = 5, max_chars: int = 500) -> list[str]:
     trimmed = history_items[-limit:]
     return [item[:max_chars] for item in trimmed]
 
+def open_subtitle_writers() -> tuple[SubtitleWriter | None, SubtitleWriter | None]:
+    """Create per-session transcript/translation tracks if SUBTITLE_DIR is set."""
+    subtitle_dir = os.getenv("SUBTITLE_DIR")
+    if not subtitle_dir:
+        return None, None
+    fmt = os.getenv("SUBTITLE_FORMAT", "srt").lower()
+    session_name = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    base = os.path.join(subtitle_dir, session_name)
+    return (
+        SubtitleWriter(f"{base}.transcript.{fmt}", fmt),
+        SubtitleWriter(f"{base}.translation.{fmt}", fmt),
+    )
+
+def word_payload(words, offset: float) -> list[dict]:
+    return [
+        {
+            "word": word.word,
+            "start": offset + word.start,
+            "end": offset + word.end,
+            "probability": word.probability,
+        }
+        for word in words
+    ]
+
+# How long a closing session waits for in-flight correction/translation tasks
+SHUTDOWN_TIMEOUT_S = 15.0
+
 # Global model instance (lazy loaded)
 asr_model = None
 translator = None
@@ -43,9 +78,13 @@ async def audio_websocket(websocket: WebSocket):
 
     current_language = "auto"
     current_target_language = os.getenv("TARGET_LANGUAGE", "zh-TW")
+    word_timestamps = os.getenv("WORD_TIMESTAMPS", "false").lower() in {"1", "true", "yes"}
     extra_context = ""
     history = deque(maxlen=50)
+    pending_tasks: set[asyncio.Task] = set()
     segment_counter = count(1)
+    speech_filter = SpeechFilter()
+    sender = EventSender(websocket)
     
     # Initialize VAD per connection
     vad = VADSequencer()
@@ -56,6 +95,12 @@ async def audio_websocket(websocket: WebSocket):
         await websocket.close(code=1011)
         return
 
+    try:
+        transcript_writer, translation_writer = open_subtitle_writers()
+    except Exception as e:
+        logger.error(f"Failed to open subtitle files: {e}")
+        transcript_writer, translation_writer = None, None
+
     try:
         while True:
             message = await websocket.receive()
@@ -76,10 +121,13 @@ async def audio_websocket(websocket: WebSocket):
                         current_language = payload.get("language", "auto")
                         current_target_language = payload.get("target_language", current_target_language)
                         extra_context = payload.get("extra_context", extra_context)
+                        word_timestamps = read_flag(payload, "word_timestamps", word_timestamps)
                         logger.info(f"ASR language set to: {current_language}")
                         logger.info(f"Target language set to: {current_target_language}")
                         if extra_context:
                             logger.info("Extra context updated.")
+                        if {"protocol", "compress", "coalesce"} & payload.keys():
+                            await sender.configure(payload)
                     continue
                 except Exception as e:
                     logger.warning(f"Failed to parse text message: {e}")
@@ -99,35 +147,51 @@ async def audio_websocket(websocket: WebSocket):
             for event in events:
                 if event["type"] == "start":
                     logger.info("VAD: Speech START")
-                    await websocket.send_json({"type": "vad_start"})
+                    await sender.send({"type": "vad_start"})
                 elif event["type"] == "commit":
                     audio = event["audio"]
                     duration_ms = (len(audio) / 16000) * 1000
+                    # Whisper timestamps are relative to the commit; shift them onto the stream
+                    offset = event["start_sample"] / vad.sample_rate
                     logger.info(f"VAD: Speech COMMIT ({duration_ms:.0f}ms)")
-                    await websocket.send_json({
+                    await sender.send({
                         "type": "vad_commit", 
                         "duration_ms": duration_ms
                     })
+                    if not speech_filter.should_transcribe(audio):
+                        continue
                     # Transcribe
                     try:
                         engine = get_asr_model()
-                        segments = await asyncio.to_thread(engine.transcribe, audio, current_language)
+                        segments = await asyncio.to_thread(
+                            engine.transcribe, audio, current_language, word_timestamps
+                        )
                         translator_instance = get_translator()
 
                         for segment in segments:
                             text = segment.text.strip()
+                            if not speech_filter.accept_segment(segment, text):
+                                continue
                             segment_id = next(segment_counter)
-                            segment_start = segment.start
-                            segment_end = segment.end
+                            segment_start = offset + segment.start
+                            segment_end = offset + segment.end
+                            words = word_payload(segment.words or [], offset) if word_timestamps else []
+                            if words:
+                                # Word timings are tighter than Whisper's padded segment bounds
+                                segment_start = words[0]["start"]
+                                segment_end = words[-1]["end"]
                             logger.info(f"ASR: {text}")
-                            await websocket.send_json({
+                            transcript_event = {
                                 "type": "transcript",
                                 "segment_id": segment_id,
                                 "text": text,
                                 "start": segment_start,
                                 "end": segment_end,
                                 "duration_ms": duration_ms
-                            })
+                            }
+                            if words:
+                                transcript_event["words"] = words
+                            await sender.send(transcript_event)
 
                             async def translate_and_send(
                                 segment_id_snapshot: int,
@@ -135,42 +199,59 @@ async def audio_websocket(websocket: WebSocket):
                                 start_snapshot: float,
                                 end_snapshot: float,
                             ):
-                                context_history = trim_history(list(history))
-                                corrected = await translator_instance.correct_text(text_snapshot, context_history)
-                                if corrected and corrected != text_snapshot:
-                                    await websocket.send_json({
-                                        "type": "transcript_corrected",
+                                source_text = text_snapshot
+                                source_submitted = False
+                                translated = None
+                                try:
+                                    context_history = trim_history(list(history))
+                                    corrected = await translator_instance.correct_text(text_snapshot, context_history)
+                                    source_text = corrected or text_snapshot
+                                    # Captions get the corrected text, in segment order
+                                    if transcript_writer:
+                                        transcript_writer.submit(segment_id_snapshot, start_snapshot, end_snapshot, source_text)
+                                    source_submitted = True
+                                    if corrected and corrected != text_snapshot:
+                                        await sender.send({
+                                            "type": "transcript_corrected",
+                                            "segment_id": segment_id_snapshot,
+                                            "text": corrected,
+                                            "source_text": text_snapshot,
+                                            "start": start_snapshot,
+                                            "end": end_snapshot,
+                                            "duration_ms": duration_ms
+                                        })
+
+                                    history.append(corrected or text_snapshot)
+
+                                    translated = await translator_instance.translate_text(
+                                        corrected or text_snapshot,
+                                        context_history,
+                                        current_target_language,
+                                        extra_context,
+                                    )
+                                    if translated is None:
+                                        return
+                                    await sender.send({
+                                        "type": "translation",
                                         "segment_id": segment_id_snapshot,
-                                        "text": corrected,
-                                        "source_text": text_snapshot,
+                                        "text": translated,
+                                        "source_text": corrected or text_snapshot,
                                         "start": start_snapshot,
                                         "end": end_snapshot,
                                         "duration_ms": duration_ms
                                     })
+                                finally:
+                                    # Always resolve the segment so later cues are not held back
+                                    if transcript_writer and not source_submitted:
+                                        transcript_writer.submit(segment_id_snapshot, start_snapshot, end_snapshot, source_text)
+                                    if translation_writer:
+                                        translation_writer.submit(segment_id_snapshot, start_snapshot, end_snapshot, translated)
 
-                                history.append(corrected or text_snapshot)
-
-                                translated = await translator_instance.translate_text(
-                                    corrected or text_snapshot,
-                                    context_history,
-                                    current_target_language,
-                                    extra_context,
-                                )
-                                if translated is None:
-                                    return
-                                await websocket.send_json({
-                                    "type": "translation",
-                                    "segment_id": segment_id_snapshot,
-                                    "text": translated,
-                                    "source_text": corrected or text_snapshot,
-                                    "start": start_snapshot,
-                                    "end": end_snapshot,
-                                    "duration_ms": duration_ms
-                                })
-
-                            asyncio.create_task(
+                            task = asyncio.create_task(
                                 translate_and_send(segment_id, text, segment_start, segment_end)
                             )
+                            pending_tasks.add(task)
+                            task.add_done_callback(pending_tasks.discard)
                     except Exception as e:
                         logger.error(f"ASR Error: {e}")
                     
@@ -178,3 +259,21 @@ async def audio_websocket(websocket: WebSocket):
         logger.info("Client disconnected")
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
+    finally:
+        # Stop emitting to the dropped socket. In-flight translations only
+        # matter if their cues still have to reach the subtitle files.
+        sender.closed = True
+        if not (transcript_writer or translation_writer):
+            for task in list(pending_tasks):
+                task.cancel()
+        elif pending_tasks:
+            try:
+                await asyncio.wait_for(
+                    asyncio.gather(*pending_tasks, return_exceptions=True),
+                    SHUTDOWN_TIMEOUT_S,
+                )
+            except asyncio.TimeoutError:
+                logger.warning("Timed out waiting for pending translations.")
+        for writer in (transcript_writer, translation_writer):
+            if writer:
+                writer.close()
@@ -10,10 +10,11 @@ class ASREngine:
         self.model = WhisperModel(model_size, device=device, compute_type=compute_type)
         logger.info("Whisper model loaded.")
 
-    def transcribe(self, audio_data: np.ndarray, language: str | None = None):
+    def transcribe(self, audio_data: np.ndarray, language: str | None = None, word_timestamps: bool = False):
         """
         Transcribe audio chunk (16kHz, float32 or int16).
-        Returns list of segments.
+        Returns list of segments. Timestamps are relative to the chunk;
+        segment.words is populated when word_timestamps is True.
         """
         # Ensure float32 for faster-whisper
         if audio_data.dtype == np.int16:
@@ -23,6 +24,7 @@ class ASREngine:
         transcribe_kwargs = {
             "beam_size": 1,
             "condition_on_previous_text": False,
+            "word_timestamps": word_timestamps,
         }
 
         if language and language != "auto":
@@ -0,0 +1,172 @@
+import os
+import time
+import logging
+import numpy as np
+
+logger = logging.getLogger("SpeechFilter")
+
+# Frames quieter than this (absolute) or this far below the loudest frame are
+# treated as silence and excluded from the commit-level metrics. Every VAD
+# commit ends with min_silence_ms of trailing silence, often exact zeros.
+FRAME_FLOOR_DB = -70.0
+ACTIVE_FRAME_RANGE_DB = 30.0
+
+# Both noise metrics are measured over the speech band only, so low-frequency
+# rumble and hum do not dominate them.
+SPEECH_BAND_HZ = (300.0, 4000.0)
+
+# Below this speech-band flatness a commit is tonal (voiced speech, music) and
+# is never treated as stationary noise, however steady its level.
+TONAL_MAX_FLATNESS = 0.1
+
+
+class SpeechFilter:
+    """
+    Cheap gates around the ASR call.
+    - Pre-ASR: drops committed buffers that are near-silent (low RMS energy
+      over the active frames) or noise-like before Whisper sees them. Noise is
+      either hiss (high speech-band spectral flatness) or a steady broadband
+      sound like a fan or HVAC (speech-band energy barely modulates, where
+      speech rises and falls with every syllable).
+    - Post-ASR: drops segments Whisper itself flags as non-speech or
+      repetitive, and a transcript identical to the previous one within a
+      few seconds, before they trigger correction/translation.
+    """
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        min_rms_db: float | None = None,
+        max_flatness: float | None = None,
+        min_modulation_db: float | None = None,
+        max_no_speech_prob: float | None = None,
+        no_speech_max_logprob: float | None = None,
+        max_compression_ratio: float | None = None,
+        dedupe_window_s: float | None = None,
+        frame_size: int = 512,
+    ):
+        self.sample_rate = sample_rate
+        self.min_rms_db = min_rms_db if min_rms_db is not None else float(os.getenv("FILTER_MIN_RMS_DB", "-45"))
+        self.max_flatness = max_flatness if max_flatness is not None else float(os.getenv("FILTER_MAX_FLATNESS", "0.4"))
+        self.min_modulation_db = min_modulation_db if min_modulation_db is not None else float(os.getenv("FILTER_MIN_MODULATION_DB", "2.5"))
+        self.max_no_speech_prob = max_no_speech_prob if max_no_speech_prob is not None else float(os.getenv("FILTER_MAX_NO_SPEECH_PROB", "0.6"))
+        self.no_speech_max_logprob = no_speech_max_logprob if no_speech_max_logprob is not None else float(os.getenv("FILTER_NO_SPEECH_MAX_LOGPROB", "-1.0"))
+        self.max_compression_ratio = max_compression_ratio if max_compression_ratio is not None else float(os.getenv("FILTER_MAX_COMPRESSION_RATIO", "2.4"))
+        self.dedupe_window_s = dedupe_window_s if dedupe_window_s is not None else float(os.getenv("FILTER_DEDUPE_WINDOW_S", "5"))
+        self.frame_size = frame_size
+
+        # Previous accepted transcript (normalized) and when it was accepted
+        self._last_key: str | None = None
+        self._last_time = 0.0
+
+    def should_transcribe(self, audio: np.ndarray) -> bool:
+        """Return False if the committed int16 buffer is not worth an ASR call."""
+        if audio.size == 0:
+            return False
+
+        samples = audio.astype(np.float32)
+        if audio.dtype == np.int16:
+            samples /= 32768.0
+
+        frames = self._active_frames(samples)
+        if len(frames) == 0:
+            logger.info("Filter: dropped commit (no active frames)")
+            return False
+
+        rms = float(np.sqrt(np.mean(frames * frames)))
+        rms_db = 20.0 * np.log10(rms + 1e-10)
+        if rms_db < self.min_rms_db:
+            logger.info(f"Filter: dropped commit (energy {rms_db:.1f} dBFS)")
+            return False
+
+        power = self._band_power(frames)
+        flatness = self._spectral_flatness(power)
+        if flatness > self.max_flatness:
+            logger.info(f"Filter: dropped commit (spectral flatness {flatness:.2f})")
+            return False
+
+        modulation = self._energy_modulation(power)
+        if flatness > TONAL_MAX_FLATNESS and modulation < self.min_modulation_db:
+            logger.info(
+                f"Filter: dropped commit (stationary noise, modulation {modulation:.1f} dB, "
+                f"flatness {flatness:.2f})"
+            )
+            return False
+
+        return True
+
+    def accept_segment(self, segment, text: str, now: float | None = None) -> bool:
+        """Return False if an ASR segment looks like a hallucination or a repeat."""
+        if not text:
+            return False
+
+        # Same rule as Whisper's own silence detection: only drop when the
+        # decode was also unconfident.
+        no_speech_prob = getattr(segment, "no_speech_prob", 0.0)
+        avg_logprob = getattr(segment, "avg_logprob", 0.0)
+        if no_speech_prob > self.max_no_speech_prob and avg_logprob < self.no_speech_max_logprob:
+            logger.info(
+                f"Filter: dropped segment (no_speech_prob {no_speech_prob:.2f}, "
+                f"avg_logprob {avg_logprob:.2f}): {text}"
+            )
+            return False
+
+        compression_ratio = getattr(segment, "compression_ratio", 0.0)
+        if compression_ratio > self.max_compression_ratio:
+            logger.info(f"Filter: dropped segment (compression_ratio {compression_ratio:.2f}): {text}")
+            return False
+
+        key = self._normalize(text)
+        if not key:
+            return False
+
+        now = time.monotonic() if now is None else now
+        if (
+            self.dedupe_window_s > 0
+            and key == self._last_key
+            and now - self._last_time < self.dedupe_window_s
+        ):
+            logger.info(f"Filter: dropped duplicate segment: {text}")
+            return False
+
+        self._last_key = key
+        self._last_time = now
+        return True
+
+    def _active_frames(self, samples: np.ndarray) -> np.ndarray:
+        """Split into frames and keep only those above the silence floor."""
+        n_frames = len(samples) // self.frame_size
+        if n_frames == 0:
+            return np.empty((0, self.frame_size), dtype=np.float32)
+
+        frames = samples[: n_frames * self.frame_size].reshape(n_frames, self.frame_size)
+        frame_db = 10.0 * np.log10(np.mean(frames * frames, axis=1) + 1e-20)
+        floor = max(FRAME_FLOOR_DB, float(frame_db.max()) - ACTIVE_FRAME_RANGE_DB)
+        return frames[frame_db >= floor]
+
+    def _band_power(self, frames: np.ndarray) -> np.ndarray:
+        """Per-frame power spectrum restricted to the speech band."""
+        frame_size = frames.shape[1]
+        frames = frames * np.hanning(frame_size).astype(np.float32)
+        power = np.abs(np.fft.rfft(frames, axis=1)) ** 2 + 1e-12
+        freqs = np.fft.rfftfreq(frame_size, 1.0 / self.sample_rate)
+        low, high = SPEECH_BAND_HZ
+        return power[:, (freqs >= low) & (freqs <= high)]
+
+    def _spectral_flatness(self, power: np.ndarray) -> float:
+        """
+        Mean spectral flatness (geometric / arithmetic mean of power) over frames.
+        With this estimator white noise is ~0.57, pink ~0.45, brown/HVAC ~0.2,
+        voiced speech below ~0.1.
+        """
+        geometric = np.exp(np.mean(np.log(power), axis=1))
+        arithmetic = np.mean(power, axis=1)
+        return float(np.mean(geometric / arithmetic))
+
+    def _energy_modulation(self, power: np.ndarray) -> float:
+        """Standard deviation (dB) of speech-band energy across frames."""
+        if len(power) < 2:
+            return 0.0
+        return float(np.std(10.0 * np.log10(np.sum(power, axis=1))))
+
+    def _normalize(self, text: str) -> str:
+        return "".join(ch for ch in text.lower() if ch.isalnum())
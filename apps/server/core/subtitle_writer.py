@@ -0,0 +1,93 @@
+import logging
+from pathlib import Path
+
+logger = logging.getLogger("SubtitleWriter")
+
+
+class SubtitleWriter:
+    """
+    Streaming SRT/WebVTT writer.
+    Cues are appended and flushed as they arrive, so the file on disk is a
+    valid subtitle track at any point during the session. The file is only
+    created with the first cue, so sessions without speech leave nothing behind.
+    Cues produced out of order (e.g. by concurrent translation tasks) go
+    through submit(), which holds them back until every earlier sequence
+    number has been resolved.
+    """
+    def __init__(self, path: str | Path, fmt: str = "srt"):
+        if fmt not in {"srt", "vtt"}:
+            raise ValueError(f"Unsupported subtitle format: {fmt}")
+
+        self.path = Path(path)
+        self.fmt = fmt
+        self.cue_index = 0
+        self._next_seq = 1
+        self._pending: dict[int, tuple[float, float, str | None]] = {}
+        self._file = None
+        self._closed = False
+
+    def _open(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "w", encoding="utf-8")
+        if self.fmt == "vtt":
+            self._file.write("WEBVTT\n\n")
+        logger.info(f"Writing subtitles to: {self.path}")
+
+    def append(self, start: float, end: float, text: str) -> None:
+        """Append one cue. Times are stream-absolute seconds."""
+        text = text.strip()
+        if not text or self._closed:
+            return
+        if self._file is None:
+            try:
+                self._open()
+            except OSError as e:
+                logger.error(f"Failed to open subtitle file {self.path}: {e}")
+                self._closed = True
+                return
+
+        end = max(end, start)
+        self.cue_index += 1
+        # A blank line terminates a cue in both formats, so collapse them.
+        body = "\n".join(line for line in text.splitlines() if line.strip())
+        self._file.write(
+            f"{self.cue_index}\n"
+            f"{self._format_time(start)} --> {self._format_time(end)}\n"
+            f"{body}\n\n"
+        )
+        self._file.flush()
+
+    def submit(self, seq: int, start: float, end: float, text: str | None) -> None:
+        """
+        Queue the cue for sequence number seq (consecutive, starting at 1).
+        Pass text=None to resolve a sequence number that produced no cue.
+        """
+        if seq < self._next_seq:
+            return
+        self._pending[seq] = (start, end, text)
+        while self._next_seq in self._pending:
+            start, end, text = self._pending.pop(self._next_seq)
+            self._next_seq += 1
+            if text:
+                self.append(start, end, text)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        # Write whatever is still held back behind an unresolved gap
+        for seq in sorted(self._pending):
+            start, end, text = self._pending[seq]
+            if text:
+                self.append(start, end, text)
+        self._pending.clear()
+        self._closed = True
+        if self._file is not None:
+            self._file.close()
+
+    def _format_time(self, seconds: float) -> str:
+        total_ms = max(int(round(seconds * 1000)), 0)
+        hours, rem = divmod(total_ms, 3_600_000)
+        minutes, rem = divmod(rem, 60_000)
+        secs, ms = divmod(rem, 1000)
+        separator = "," if self.fmt == "srt" else "."
+        return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{ms:03d}"
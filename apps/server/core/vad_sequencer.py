@@ -24,6 +24,10 @@ class VADSequencer:
         self.triggered = False
         self.temp_end = 0
         self.current_speech = [] # List of numpy arrays (int16)
+
+        # Stream position in samples, used to report stream-absolute timing
+        self.samples_processed = 0
+        self.speech_start_sample = 0
         
         # Buffer for incoming data
         self.buffer = bytearray()
@@ -50,7 +54,8 @@ class VADSequencer:
         Returns a list of events.
         Events:
           - {"type": "start"}
-          - {"type": "commit", "audio": np.array(int16)}
+          - {"type": "commit", "audio": np.array(int16), "start_sample": int, "end_sample": int}
+        Sample offsets are relative to the start of the stream.
         """
         if not self.model:
             self.init_model()
@@ -73,6 +78,8 @@ class VADSequencer:
             # Convert to numpy and then float32 for model
             audio_int16 = np.frombuffer(chunk_bytes, dtype=np.int16)
             audio_float32 = audio_int16.astype(np.float32) / 32768.0
+            window_start_sample = self.samples_processed
+            self.samples_processed += window_size_samples
             
             # Predict
             # model(x, sr) -> prob
@@ -85,6 +92,7 @@ class VADSequencer:
                 # Speech detected
                 if not self.triggered:
                     self.triggered = True
+                    self.speech_start_sample = window_start_sample
                     events.append({"type": "start"})
                 
                 self.current_speech.append(audio_int16)
@@ -100,7 +108,12 @@ class VADSequencer:
                         self.triggered = False
                         if self.current_speech:
                             full_speech = np.concatenate(self.current_speech)
-                            events.append({"type": "commit", "audio": full_speech})
+                            events.append({
+                                "type": "commit",
+                                "audio": full_speech,
+                                "start_sample": self.speech_start_sample,
+                                "end_sample": self.samples_processed,
+                            })
                             self.current_speech = []
         
         return events
\ No newline at end of file
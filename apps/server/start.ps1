@@ -7,4 +7,4 @@ param(
 
 Write-Host "Starting Live Translator Server on port $Port..." -ForegroundColor Cyan
 
-uv run uvicorn main:app --host 0.0.0.0 --port $Port --reload
+uv run --extra compact uvicorn main:app --host 0.0.0.0 --port $Port --reload
@@ -6,4 +6,4 @@ PORT=${1:-8001}
 
 echo "Starting Live Translator Server on port $PORT..."
 
-uv run uvicorn main:app --host 0.0.0.0 --port $PORT --reload
+uv run --extra compact uvicorn main:app --host 0.0.0.0 --port $PORT --reload
@@ -0,0 +1,136 @@
+import asyncio
+import json
+import zlib
+
+import pytest
+
+from api.protocol import FLAG_BATCH, FLAG_DEFLATE, EventSender
+
+msgpack = pytest.importorskip("msgpack")
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.frames = []
+
+    async def send_json(self, data):
+        self.frames.append(("json", data))
+
+    async def send_text(self, data):
+        self.frames.append(("text", data))
+
+    async def send_bytes(self, data):
+        self.frames.append(("bytes", data))
+
+
+def decode(frame: bytes):
+    flags, payload = frame[0], frame[1:]
+    if flags & FLAG_DEFLATE:
+        payload = zlib.decompress(payload, -zlib.MAX_WBITS)
+    return flags, msgpack.unpackb(payload)
+
+
+def translation(segment_id: int) -> dict:
+    return {
+        "type": "translation",
+        "segment_id": segment_id,
+        "text": "hello world " * 5,
+        "source_text": "hola mundo",
+        "start": 1.0,
+        "end": 2.0,
+        "duration_ms": 1000.0,
+    }
+
+
+def test_json_is_default():
+    async def run():
+        ws = FakeWebSocket()
+        await EventSender(ws).send({"type": "vad_start"})
+        return ws.frames
+
+    assert asyncio.run(run()) == [("json", {"type": "vad_start"})]
+
+
+def test_configure_acks_before_switching():
+    async def run():
+        ws = FakeWebSocket()
+        sender = EventSender(ws)
+        await sender.configure({"protocol": "msgpack", "compress": True})
+        await sender.send({"type": "vad_start"})
+        return ws.frames
+
+    frames = asyncio.run(run())
+    assert frames[0] == ("json", {"type": "config_ack", "protocol": "msgpack", "compress": True, "coalesce": False})
+    assert frames[1][0] == "bytes"
+    assert decode(frames[1][1]) == (0, {"t": 0})
+
+
+def test_configure_unknown_protocol_and_non_bool_flags():
+    async def run():
+        ws = FakeWebSocket()
+        sender = EventSender(ws)
+        await sender.configure({"protocol": "protobuf", "compress": "true", "coalesce": "false"})
+        return sender, ws.frames
+
+    sender, frames = asyncio.run(run())
+    assert frames == [("json", {"type": "config_ack", "protocol": "json", "compress": False, "coalesce": False})]
+    assert sender.compress is False
+    assert sender.coalesce is False
+
+
+def test_encode_compact_shortens_and_deflates():
+    sender = EventSender(FakeWebSocket())
+    sender.protocol = "msgpack"
+    sender.compress = True
+    flags, body = decode(sender.encode_compact([translation(1), translation(2)]))
+    assert flags == FLAG_DEFLATE | FLAG_BATCH
+    assert body[0] == {"t": 4, "i": 1, "x": "hello world " * 5, "s": "hola mundo", "b": 1.0, "e": 2.0, "d": 1000.0}
+    assert body[1]["i"] == 2
+
+
+def test_small_payload_not_deflated():
+    sender = EventSender(FakeWebSocket())
+    sender.compress = True
+    assert decode(sender.encode_compact([{"type": "vad_start"}])) == (0, {"t": 0})
+
+
+def test_coalesces_events_from_same_tick():
+    async def run():
+        ws = FakeWebSocket()
+        sender = EventSender(ws)
+        await sender.configure({"coalesce": True})
+        await asyncio.gather(*(sender.send(translation(i)) for i in range(3)))
+        await asyncio.sleep(0.01)
+        return ws.frames
+
+    frames = asyncio.run(run())
+    assert len(frames) == 2
+    kind, text = frames[1]
+    assert kind == "text"
+    assert [event["segment_id"] for event in json.loads(text)] == [0, 1, 2]
+
+
+def test_words_become_positional_arrays():
+    sender = EventSender(FakeWebSocket())
+    event = {
+        "type": "transcript",
+        "segment_id": 1,
+        "text": "hi there",
+        "words": [
+            {"word": " hi", "start": 10.0, "end": 10.2, "probability": 0.9},
+            {"word": " there", "start": 10.2, "end": 10.6, "probability": 0.8},
+        ],
+    }
+    _, body = decode(sender.encode_compact([event]))
+    assert body["w"] == [[" hi", 10.0, 10.2, 0.9], [" there", 10.2, 10.6, 0.8]]
+
+
+def test_closed_sender_drops_events():
+    async def run():
+        ws = FakeWebSocket()
+        sender = EventSender(ws)
+        sender.closed = True
+        await sender.send({"type": "vad_start"})
+        return ws.frames
+
+    assert asyncio.run(run()) == []
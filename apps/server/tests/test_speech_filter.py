@@ -0,0 +1,128 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from core.speech_filter import SpeechFilter
+
+SAMPLE_RATE = 16000
+
+
+def make_filter(**kwargs) -> SpeechFilter:
+    defaults = {
+        "min_rms_db": -45.0,
+        "max_flatness": 0.4,
+        "min_modulation_db": 2.5,
+        "max_no_speech_prob": 0.6,
+        "no_speech_max_logprob": -1.0,
+        "max_compression_ratio": 2.4,
+        "dedupe_window_s": 5.0,
+    }
+    defaults.update(kwargs)
+    return SpeechFilter(**defaults)
+
+
+def harmonic(duration_s: float, amplitude: float = 0.3) -> np.ndarray:
+    t = np.arange(int(duration_s * SAMPLE_RATE)) / SAMPLE_RATE
+    signal = sum(np.sin(2 * np.pi * 150 * k * t) / k for k in range(1, 6))
+    signal = amplitude * signal / np.max(np.abs(signal))
+    return (signal * 32767).astype(np.int16)
+
+
+def colored_noise(alpha: float, rms_dbfs: float, duration_s: float = 1.0, seed: int = 0) -> np.ndarray:
+    """1/f**alpha noise: 0 white, 1 pink, 2 brown."""
+    n = int(duration_s * SAMPLE_RATE)
+    spectrum = np.fft.rfft(np.random.default_rng(seed).standard_normal(n))
+    freqs = np.fft.rfftfreq(n, 1.0 / SAMPLE_RATE)
+    freqs[0] = freqs[1]
+    noise = np.fft.irfft(spectrum / freqs ** (alpha / 2), n)
+    noise *= 10 ** (rms_dbfs / 20) / np.sqrt(np.mean(noise ** 2))
+    return (noise * 32767).astype(np.int16)
+
+
+def voiced(duration_s: float, f0: float = 140.0) -> np.ndarray:
+    """Harmonic source with a 4 Hz syllable envelope."""
+    t = np.arange(int(duration_s * SAMPLE_RATE)) / SAMPLE_RATE
+    signal = sum(np.sin(2 * np.pi * f0 * k * t) / k for k in range(1, 25))
+    signal *= np.clip(np.sin(2 * np.pi * 4 * t), 0.05, 1.0)
+    return (0.3 * signal / np.max(np.abs(signal)) * 32767).astype(np.int16)
+
+
+def segment(no_speech_prob=0.1, avg_logprob=-0.3, compression_ratio=1.2):
+    return SimpleNamespace(
+        no_speech_prob=no_speech_prob,
+        avg_logprob=avg_logprob,
+        compression_ratio=compression_ratio,
+    )
+
+
+def test_drops_silence():
+    assert not make_filter().should_transcribe(np.zeros(SAMPLE_RATE, dtype=np.int16))
+
+
+def test_drops_white_noise():
+    rng = np.random.default_rng(0)
+    noise = (rng.standard_normal(SAMPLE_RATE) * 3000).astype(np.int16)
+    assert not make_filter().should_transcribe(noise)
+
+
+def test_drops_colored_noise():
+    speech_filter = make_filter()
+    # Pink, brown and HVAC-like rumble (brown plus mains hum)
+    assert not speech_filter.should_transcribe(colored_noise(1, -22))
+    assert not speech_filter.should_transcribe(colored_noise(2, -22))
+    t = np.arange(SAMPLE_RATE) / SAMPLE_RATE
+    hum = (0.02 * np.sin(2 * np.pi * 60 * t) * 32767).astype(np.int16)
+    assert not speech_filter.should_transcribe(colored_noise(2, -25, seed=1) + hum)
+
+
+def test_keeps_speech_in_noise():
+    speech = voiced(1.0)
+    for rms_dbfs in (-35, -30):
+        audio = (speech.astype(np.int32) + colored_noise(1, rms_dbfs)).clip(-32768, 32767).astype(np.int16)
+        assert make_filter().should_transcribe(audio), rms_dbfs
+
+
+def test_keeps_short_utterance_with_trailing_zeros():
+    # VAD commits always end with min_silence_ms of trailing silence
+    for tail_ms in (512, 600, 1000):
+        tail = np.zeros(SAMPLE_RATE * tail_ms // 1000, dtype=np.int16)
+        audio = np.concatenate([harmonic(0.4), tail])
+        assert make_filter().should_transcribe(audio), tail_ms
+
+
+def test_keeps_quiet_speech_with_trailing_zeros():
+    audio = np.concatenate([harmonic(0.4, amplitude=0.02), np.zeros(16000, dtype=np.int16)])
+    assert make_filter().should_transcribe(audio)
+
+
+def test_no_speech_prob_requires_low_logprob():
+    speech_filter = make_filter()
+    assert speech_filter.accept_segment(segment(no_speech_prob=0.9, avg_logprob=-0.2), "Hello.", now=0.0)
+    assert not speech_filter.accept_segment(segment(no_speech_prob=0.9, avg_logprob=-1.5), "Thank you.", now=1.0)
+
+
+def test_drops_high_compression_ratio():
+    assert not make_filter().accept_segment(segment(compression_ratio=3.0), "la la la la", now=0.0)
+
+
+def test_drops_empty_and_punctuation_only():
+    speech_filter = make_filter()
+    assert not speech_filter.accept_segment(segment(), "", now=0.0)
+    assert not speech_filter.accept_segment(segment(), "...", now=0.0)
+
+
+def test_dedupe_only_consecutive_within_window():
+    speech_filter = make_filter()
+    assert speech_filter.accept_segment(segment(), "Yes.", now=0.0)
+    assert not speech_filter.accept_segment(segment(), "yes", now=1.0)
+    assert speech_filter.accept_segment(segment(), "No.", now=2.0)
+    # Not consecutive any more
+    assert speech_filter.accept_segment(segment(), "Yes.", now=3.0)
+    # Window expired
+    assert speech_filter.accept_segment(segment(), "Yes.", now=10.0)
+
+
+def test_dedupe_disabled():
+    speech_filter = make_filter(dedupe_window_s=0)
+    assert speech_filter.accept_segment(segment(), "Okay.", now=0.0)
+    assert speech_filter.accept_segment(segment(), "Okay.", now=0.1)
@@ -0,0 +1,70 @@
+import pytest
+
+from core.subtitle_writer import SubtitleWriter
+
+
+def test_srt_cues(tmp_path):
+    path = tmp_path / "session.srt"
+    writer = SubtitleWriter(path)
+    writer.append(1.5, 2.0, "Hello")
+    writer.append(3661.2345, 3663.5, "line one\n\nline two")
+    # Flushed incrementally, readable before close
+    assert "Hello" in path.read_text(encoding="utf-8")
+    writer.close()
+
+    assert path.read_text(encoding="utf-8") == (
+        "1\n00:00:01,500 --> 00:00:02,000\nHello\n\n"
+        "2\n01:01:01,234 --> 01:01:03,500\nline one\nline two\n\n"
+    )
+
+
+def test_vtt_header_and_separator(tmp_path):
+    path = tmp_path / "session.vtt"
+    writer = SubtitleWriter(path, "vtt")
+    writer.append(0.25, 0.1, "end before start")
+    writer.close()
+
+    assert path.read_text(encoding="utf-8") == (
+        "WEBVTT\n\n1\n00:00:00.250 --> 00:00:00.250\nend before start\n\n"
+    )
+
+
+def test_rejects_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        SubtitleWriter(tmp_path / "session.ass", "ass")
+
+
+def test_submit_writes_in_sequence_order(tmp_path):
+    path = tmp_path / "session.srt"
+    writer = SubtitleWriter(path)
+    writer.submit(2, 2.0, 3.0, "second")
+    assert not path.exists()
+    writer.submit(3, 3.0, 4.0, None)
+    writer.submit(1, 0.0, 1.0, "first")
+    writer.submit(4, 4.0, 5.0, "fourth")
+    writer.close()
+
+    text = path.read_text(encoding="utf-8")
+    assert text.index("first") < text.index("second") < text.index("fourth")
+    assert text.startswith("1\n00:00:00,000")
+    assert "3\n00:00:04,000 --> 00:00:05,000\nfourth" in text
+
+
+def test_close_flushes_cues_held_behind_gap(tmp_path):
+    path = tmp_path / "session.srt"
+    writer = SubtitleWriter(path)
+    writer.submit(2, 2.0, 3.0, "late")
+    writer.close()
+    writer.append(5.0, 6.0, "after close")
+
+    assert path.read_text(encoding="utf-8") == "1\n00:00:02,000 --> 00:00:03,000\nlate\n\n"
+
+
+def test_no_file_without_cues(tmp_path):
+    path = tmp_path / "captions" / "session.vtt"
+    writer = SubtitleWriter(path, "vtt")
+    writer.submit(1, 0.0, 1.0, None)
+    writer.close()
+
+    assert not path.exists()
+    assert not path.parent.exists()
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("torch")
+
+from core.vad_sequencer import VADSequencer
+
+WINDOW = 512
+
+
+class FakeVADModel:
+    """Treats any window with non-zero samples as speech."""
+    def __call__(self, audio, sample_rate):
+        return FakeProb(1.0 if float(audio.abs().max()) > 0 else 0.0)
+
+
+class FakeProb:
+    def __init__(self, value: float):
+        self.value = value
+
+    def item(self) -> float:
+        return self.value
+
+
+def windows(n: int, speech: bool) -> bytes:
+    value = 1000 if speech else 0
+    return np.full(n * WINDOW, value, dtype=np.int16).tobytes()
+
+
+def make_vad() -> VADSequencer:
+    vad = VADSequencer(min_silence_duration_ms=100)
+    vad.model = FakeVADModel()
+    return vad
+
+
+def test_commit_carries_stream_sample_offsets():
+    vad = make_vad()
+    # 100ms of silence needs 4 windows of 32ms
+    events = vad.process(windows(3, False) + windows(5, True) + windows(4, False))
+
+    assert [event["type"] for event in events] == ["start", "commit"]
+    commit = events[1]
+    assert commit["start_sample"] == 3 * WINDOW
+    assert commit["end_sample"] == 12 * WINDOW
+    assert len(commit["audio"]) == commit["end_sample"] - commit["start_sample"]
+
+
+def test_offsets_accumulate_across_chunks_and_commits():
+    vad = make_vad()
+    events = []
+    # Split mid-window to exercise buffering
+    stream = windows(2, True) + windows(4, False) + windows(10, False) + windows(1, True) + windows(4, False)
+    for i in range(0, len(stream), 700):
+        events.extend(vad.process(stream[i:i + 700]))
+
+    commits = [event for event in events if event["type"] == "commit"]
+    assert [(c["start_sample"], c["end_sample"]) for c in commits] == [
+        (0, 6 * WINDOW),
+        (16 * WINDOW, 21 * WINDOW),
+    ]
+    assert vad.samples_processed == 21 * WINDOW